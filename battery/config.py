@@ -17,6 +17,7 @@ DPOT_INIT = 0
 
 # Battery params
 N = 1000  # Number of points along X axis
+DTYPE = 'float32'  # Precision of charge curves and metric histories
 
 # Animation save location
 ANIM_SAVE_FILE = '/Users/fayvorlove/Documents/fayvor-sim-gifs/diffusion.gif'
@@ -1,7 +1,7 @@
 """Defines a Diffusion Battery Model"""
 
 import numpy as np
-import math
+from scipy.fft import irfft, next_fast_len, rfft
 
 from .battery import Battery
 from .metric import Charge
@@ -24,6 +24,8 @@ class DiffusionBattery(Battery):
         """
         super(DiffusionBattery, self).__init__(soc, ocp, charge_curve)
         self.cathode_width = cathode_width
+        self._kernel_key = None
+        self._prepare_kernel(len(charge_curve))
 
     def apply_potential(self, potential):
         """
@@ -46,12 +48,16 @@ class DiffusionBattery(Battery):
         """
         # Get the new charge distribution given the external potential
         new_charge_curve = self.compute_charge_curve(potential, self.charge_curve)
+        # The total charge is linear in the potential too, so it comes from the cached sum.
+        _, undriven_charge = self._diffuse_undriven(self.charge_curve)
 
-        # Set the battery state.
+        # Set the battery state.  The new curve is made read-only so that its diffusion can be
+        # cached for the next timestep.
+        new_charge_curve.flags.writeable = False
         self.charge_curve = new_charge_curve
         self.ocp = new_charge_curve[1]
         prior_soc = self.soc
-        self.soc = self.charge_curve.sum()
+        self.soc = undriven_charge + potential * self._drive_response_charge
         timestep_current = self.soc - prior_soc
         return self.ocp, timestep_current
 
@@ -75,44 +81,137 @@ class DiffusionBattery(Battery):
         -------
         numpy.array
         """
-        y = charge_curve.copy()  # Make a copy so we still have access to the original.
-        y[0] = drive_pot
+        undriven_curve, _ = self._diffuse_undriven(charge_curve)
+        # The diffusion is linear in the drive potential, so applying it needs no transform.
+        return undriven_curve + drive_pot * self._drive_response
+
+    def _diffuse_undriven(self, charge_curve):
+        """Diffuse charge_curve for one timestep with a drive potential of zero.
+
+        Any other drive potential only adds drive_pot * self._drive_response to the result, so
+        the one transform per charge curve is shared by the driver search and apply_potential.
+
+        Returns
+        -------
+        undriven_curve : numpy.array
+        undriven_charge : float
+            The sum of undriven_curve.
+        """
+        n = len(charge_curve)
+        self._prepare_kernel(n)
+        # Only read-only curves that own their data are cached, since no one can change them in
+        # place; for those, identity is enough.  Any other curve is diffused on every call.
+        memo = self._memo
+        if memo is not None and memo[0] is charge_curve and not charge_curve.flags.writeable:
+            return memo[1], memo[2]
+        cacheable = (
+            isinstance(charge_curve, np.ndarray) and not charge_curve.flags.writeable
+            and charge_curve.base is None
+        )
+        # Fill the scratch base in place; the charge curve itself is left untouched.
+        base = self._base
+        base[0] = 0
+        base[1:n] = charge_curve[1:]
+        self._mirror(base, n)
+        undriven_curve = self._convolve(base, n)
+        undriven_charge = float(np.sum(undriven_curve))
+        if cacheable:
+            self._memo = (charge_curve, undriven_curve, undriven_charge)
+        return undriven_curve, undriven_charge
+
+    @staticmethod
+    def _mirror(base, n):
+        """Append a flipped (mirror) copy of the curve in base[:n] as a wall, filling the rest of
+        base.  The base only has room for as much of the mirror as the kernel reaches."""
+        base[n:] = base[n - 1::-1][:len(base) - n]
+
+    def _convolve(self, base, n):
+        """Convolve a base (a curve of length n and its mirror) with the Gaussian; trim to the
+        curve."""
+        # Multiply the spectra.  The spectrum is multiplied and inverted in place, so no
+        # temporaries are made between the transforms.
+        spectrum = rfft(base, n=self._fft_len)
+        spectrum *= self._gaussian_spectrum
+        convolution = irfft(spectrum, n=self._fft_len, overwrite_x=True)
+        # Trim off the extra data on the end.
+        start = self._same_offset
+        return convolution[start:start + n]
+
+    def _prepare_kernel(self, n):
+        """Precompute the Gaussian kernel and its spectrum for a charge curve of length n.
+
+        The kernel only depends on the cathode width and the length of the charge curve, so no
+        work is done unless one of them has changed since the last call.
+        """
+        key = (self.cathode_width, n)
+        if key == self._kernel_key:
+            return
         sigma = self.cathode_width / 10  # keep this above 2 * width + 1 to ensure the gaussian fits
         dx = float(1)
         width = 3
         # Make a symmetrical array
         gx = np.arange(-width * sigma, width * sigma + 1, dx)
-        # Make a normal distribution for which the area under the curve is 1.
-        gaussian = np.exp(-(gx ** 2) / (2 * sigma ** 2)) / math.sqrt(2 * math.pi * sigma ** 2)
-        # Ensure area under the curve is 1, given that the tails are getting cut off.
-        gaussian = gaussian / np.sum(gaussian)
-        zeros = np.array([0 for val in gaussian])
-        prepend = np.array([y[0] for val in gaussian])
-        # Prepend and strip an array of repeated values.  Append a flipped (mirror) copy as a wall.
-        base = np.concatenate((zeros, prepend, y, np.flip(y)))
-        pad_len = 2 * len(gaussian)
-        # Convolve the charge function with the Gaussian.
-        convolution = np.convolve(base, gaussian, mode="same")
-        # Trim off the extra data on the ends.
-        new_charge_curve = convolution[pad_len:-len(y)]
-        return new_charge_curve
+        # Make a normal distribution, computing in place in the array of positions.  Its
+        # 1 / sqrt(2 * pi * sigma ** 2) factor is left out, since the tails are cut off and the
+        # area has to be normalized by the sum anyway.
+        gaussian = gx
+        gaussian /= sigma
+        gaussian **= 2
+        gaussian *= -0.5
+        np.exp(gaussian, out=gaussian)
+        # Ensure area under the curve is 1.
+        gaussian /= np.sum(gaussian)
+        self._gaussian = gaussian.astype(config.DTYPE)
+        # Offset of a centered ("same" mode) convolution into the full convolution.
+        self._same_offset = (len(gaussian) - 1) // 2
+        # A point j of the curve picks up every tap that reaches left of the curve, i.e. the sum of
+        # the taps past j + same_offset.  Scaled by the drive potential, this is the diffusion
+        # from the wall, so the wall never has to be written into the base.
+        reach = min(n, len(gaussian) - 1 - self._same_offset)
+        tails = np.cumsum(self._gaussian[::-1])[::-1]  # tails[k] = sum(gaussian[k:])
+        wall_response = np.zeros(n, dtype=config.DTYPE)
+        wall_response[:reach] = tails[self._same_offset + 1:self._same_offset + 1 + reach]
+        # The kernel reaches same_offset points past the end of the curve, so the rest of the
+        # mirror would never be read.  The transform must hold the full linear convolution of
+        # the base without wrapping.
+        base_len = n + min(n, self._same_offset)
+        self._fft_len = next_fast_len(base_len + len(gaussian) - 1, real=True)
+        self._base = np.empty(base_len, dtype=config.DTYPE)
+        self._gaussian_spectrum = rfft(self._gaussian, n=self._fft_len)
+        # Response to a unit drive potential: the wall plus the drive potential written at x=0 and
+        # its mirror image.  It is the derivative of every result with respect to drive_pot.  An
+        # empty curve has no x=0 to drive, so its response stays empty.
+        unit_base = np.zeros(base_len, dtype=config.DTYPE)
+        if n:
+            unit_base[0] = 1
+        self._mirror(unit_base, n)
+        self._drive_response = self._convolve(unit_base, n) + wall_response
+        self._drive_response_charge = float(np.sum(self._drive_response))
+        # Results computed with the previous kernel are stale.
+        self._memo = None
+        self._kernel_key = key
 
     def compute_current(self, drive_pot, charge_curve):
-        """Get current by running a timestep computation on charge_curve."""
-        return np.sum(self.compute_charge_curve(drive_pot, charge_curve)) - np.sum(charge_curve)
+        """Get current by running a timestep computation on charge_curve.
+
+        The charge before the timestep counts drive_pot in place of charge_curve[0], as if the
+        drive potential had been written into the curve, without copying the curve to do so.
+        """
+        _, undriven_charge = self._diffuse_undriven(charge_curve)
+        prior_charge = np.sum(charge_curve) - charge_curve[0] + drive_pot
+        return undriven_charge + drive_pot * self._drive_response_charge - prior_charge
 
     def compute_ocp(self, drive_pot, charge_curve):
         """Get open circuit potential by running a timestep computation on charge_curve."""
-        return self.compute_charge_curve(drive_pot, charge_curve)[0]
+        undriven_curve, _ = self._diffuse_undriven(charge_curve)
+        return undriven_curve[0] + drive_pot * self._drive_response[0]
 
     def get_calc_current(self, charge_curve):
         """Get function calc_current."""
 
         def calc_current(drive_pot):
             """Calculate current given drive potential."""
-            new_charge_curve = charge_curve.copy()
-            new_charge_curve[0] = drive_pot
-            return self.compute_current(drive_pot, new_charge_curve)
+            return self.compute_current(drive_pot, charge_curve)
 
         return calc_current
 
@@ -121,16 +220,16 @@ class DiffusionBattery(Battery):
 
         def calc_ocp(drive_pot):
             """Calculate open circuit potential given drive potential."""
-            new_charge_curve = charge_curve.copy()
-            new_charge_curve[0] = drive_pot
-            return self.compute_ocp(drive_pot, new_charge_curve)
+            return self.compute_ocp(drive_pot, charge_curve)
 
         return calc_ocp
 
     def get_driver_for_target_current(self, target_influx):
         """Calculate drive_pot to produce the target current from charge_y."""
+        self._prepare_kernel(len(self.charge_curve))
+        # A unit of drive potential diffuses in the response's charge, less the unit it replaces.
         return self.guess_drive_pot(
-            self.charge_curve, self.compute_current, self.get_calc_current, target_influx
+            self.charge_curve, self.compute_current, self._drive_response_charge - 1, target_influx
         )
 
     def get_driver_for_target_ocp(self, target_ocp):
@@ -145,14 +244,12 @@ class DiffusionBattery(Battery):
         drive_pot : float
             The drive potential that is needed to result in the target_ocp after a timestep.
         """
+        self._prepare_kernel(len(self.charge_curve))
         return self.guess_drive_pot(
-            self.charge_curve, self.compute_ocp, self.get_calc_ocp, target_ocp
+            self.charge_curve, self.compute_ocp, float(self._drive_response[0]), target_ocp
         )
 
-    def guess_drive_pot(
-            self, charge_curve, get_val_from_charge_curve, get_val_from_charge_curve_and_drive_pot,
-            target_val
-    ):
+    def guess_drive_pot(self, charge_curve, get_val_from_charge_curve, sensitivity, target_val):
         """
 
         Parameters
@@ -161,8 +258,9 @@ class DiffusionBattery(Battery):
             The charge curve of the cathode.
         get_val_from_charge_curve : function
             Potential or Current as a function of the charge curve.
-        get_val_from_charge_curve_and_drive_pot
-            Potential or Current as a function of the charge curve and the drive potential.
+        sensitivity : float
+            Change in Potential or Current per unit change in the drive potential.  The diffusion
+            is linear, so this is a constant of the kernel rather than of the charge curve.
         target_val
             Target Potential or Current.
 
@@ -178,32 +276,11 @@ class DiffusionBattery(Battery):
             # No adjustment to drive potential is needed
             return drive_pot
         else:
-            # Find new drive potential
-            point1 = (actual_val, drive_pot)
-            # Ensure they are paired.
-            assert actual_val == get_val_from_charge_curve_and_drive_pot(charge_curve)(drive_pot)
-
-            # Make a first guess based on fixed offset
-            guess_drive_pot = drive_pot + 1
-            guess_charge_y = charge_curve.copy()
-            guess_charge_y[0] = guess_drive_pot
-            guess_val = get_val_from_charge_curve(guess_drive_pot, guess_charge_y)
-            point2 = (guess_val, guess_drive_pot)
-
-            # Assume linear relationship between drive_pot and actual_val; get slope and intercept.
-            slope, intercept = get_slope_intercept(point1, point2)
-            guess_drive_pot_fin = (slope * target_val) + intercept
-
-            return guess_drive_pot_fin
-
-
-def get_slope_intercept(pt1, pt2):
-    """Assuming a linear function through (x, y) pt1 and pt2, find the slope and y-intercept."""
-    if pt1[0] - pt2[0] == 0:
-        raise ZeroDivisionError
-    slope = (pt1[1] - pt2[1]) / (pt1[0] - pt2[0])
-    intercept = pt1[1] - slope * pt1[0]
-    return slope, intercept
+            # The relationship between drive_pot and actual_val is linear with a known slope, so
+            # step straight to the drive potential that hits the target.
+            if sensitivity == 0:
+                raise ZeroDivisionError
+            return drive_pot + (target_val - actual_val) / sensitivity
 
 
 class Anode:
@@ -8,12 +8,64 @@ from .config import *
 PLOT_ROWS = 2
 PLOT_COLS = 3
 
+# History params
+HISTORY_CAPACITY = NUM_TIMESTEPS + 1  # Initial length of a metric's history buffers
+SOC_ROW, INFLUX_ROW, DRIVER_ROW, POTENTIAL_ROW = range(4)  # Rows of the metrics in a MetricStore
+METRIC_ROWS = (SOC_ROW, INFLUX_ROW, DRIVER_ROW, POTENTIAL_ROW)
+
 Metrics = namedtuple('Metrics', ['charge', 'soc', 'influx', 'driver', 'potential'])
 
 
+class MetricStore:
+    """History of the per-timestep metrics, stored as one row per metric of a single array.
+
+    All metrics share the x values (the timesteps).  The data array is column-major, so the
+    values of one timestep are adjacent in memory and are recorded with one write, while each
+    metric's history is still a (strided) row view for plotting.
+    """
+
+    def __init__(self, num_rows=len(METRIC_ROWS), capacity=HISTORY_CAPACITY):
+        """
+
+        Parameters
+        ----------
+        num_rows : int
+            Number of metrics stored.
+        capacity : int
+            Initial number of timesteps that fit before the store has to grow.
+        """
+        self.x = np.empty(capacity, dtype=DTYPE)
+        self.data = np.empty((num_rows, capacity), dtype=DTYPE, order='F')
+        self.n = 0
+
+    def append(self, x_val, column):
+        """Record one timestep.
+
+        Parameters
+        ----------
+        x_val : float
+            The timestep.
+        column : ndarray
+            The value of each metric, indexed by its row.
+        """
+        if self.n == len(self.x):
+            # Out of room; double the buffers so appends stay amortized O(1).  Views of the old
+            # buffers stay valid, since their filled part is never written again.
+            x = np.empty(2 * self.n, dtype=DTYPE)
+            x[:self.n] = self.x
+            data = np.empty((len(self.data), 2 * self.n), dtype=DTYPE, order='F')
+            data[:, :self.n] = self.data
+            self.x, self.data = x, data
+        self.x[self.n] = x_val
+        self.data[:, self.n] = column
+        self.n += 1
+
+
 class Metric:
 
     line = None
+    row = None
+    """Row of this metric's history in a MetricStore."""
 
     @classmethod
     def add_subplot(cls, fig):
@@ -36,21 +88,35 @@ class Metric:
         cls.line.set_data(xy[0], xy[1])
         return cls.line
 
-    def __init__(self, x, y):
-        """Initialize history."""
-        self.x = np.array([x])
-        self.y = np.array([y])
+    def __init__(self, store):
+        """Attach to the history kept in store.
 
-    def update(self, x_val, y_val):
-        """Update the current value and history."""
-        self.x = np.append(self.x, x_val)
-        self.y = np.append(self.y, y_val)
+        Parameters
+        ----------
+        store : MetricStore
+        """
+        self.store = store
+
+    @property
+    def x(self):
+        """History of x values.  This is a view of the filled part of the store."""
+        return self.store.x[:self.store.n]
+
+    @property
+    def y(self):
+        """History of y values.  This is a view of the filled part of the store."""
+        return self.store.data[self.row, :self.store.n]
 
     def get_val(self):
         return self.y[-1]
 
-    def get_xy_copy(self):
-        return self.x.copy(), self.y.copy()
+    def get_xy(self):
+        """Get the history as x and y views.
+
+        History is only ever appended, so the filled part of a buffer never changes and a view
+        of it is as good as a snapshot.
+        """
+        return self.x, self.y
 
     def delta(self):
         """Get the change from the previous value to the current value."""
@@ -68,14 +134,23 @@ class Charge(Metric):
         return cls.line
 
     def __init__(self, x, y):
-        """Initialize history."""
-        self.x = np.array(x)
-        self.y = np.array(y)
+        """Initialize history.  The charge curve is not a time series, so it is kept here rather
+        than in a MetricStore."""
+        self._x = np.array(x)
+        self._y = np.array(y)
+
+    @property
+    def x(self):
+        return self._x
+
+    @property
+    def y(self):
+        return self._y
 
     @classmethod
     def get_init_vals(cls):
-        x = np.array(range(N))
-        y = np.array([0 for val in x])
+        x = np.arange(N, dtype=DTYPE)
+        y = np.zeros(N, dtype=DTYPE)
         return x, y
 
     @classmethod
@@ -85,13 +160,16 @@ class Charge(Metric):
         return cls.line
 
     def update(self, x_val, y_val):
-        """Update the current value and history."""
-        self.x = x_val
-        self.y = y_val
+        """Update the current value and history.  The battery replaces its charge curve rather
+        than modifying it, so the arrays handed out by get_xy stay valid."""
+        self._x = x_val
+        self._y = y_val
 
 
 class Current(Metric):
     """Current into the battery during a timestep."""
+    row = INFLUX_ROW
+
     @classmethod
     def add_subplot(cls, fig):
         cls.axis = fig.add_subplot(PLOT_ROWS, PLOT_COLS, 2, label="influx", xlim=(0, NUM_TIMESTEPS), ylim=(-18, 18))
@@ -101,6 +179,8 @@ class Current(Metric):
 
 class SOC(Metric):
     """Charge in the battery."""
+    row = SOC_ROW
+
     @classmethod
     def add_subplot(cls, fig):
         cls.axis = fig.add_subplot(PLOT_ROWS, PLOT_COLS, 3, label="soc", xlim=(0, NUM_TIMESTEPS), ylim=(-2, 6000))
@@ -110,6 +190,8 @@ class SOC(Metric):
 
 class Potential(Metric):
     """Open circuit potential of the battery."""
+    row = POTENTIAL_ROW
+
     @classmethod
     def add_subplot(cls, fig):
         cls.axis = fig.add_subplot(PLOT_ROWS, PLOT_COLS, 5, label="potential", xlim=(0, NUM_TIMESTEPS), ylim=(-0.1, 5))
@@ -119,6 +201,8 @@ class Potential(Metric):
 
 class Driver(Metric):
     """Driving potential used by the tester to achieve the targets in the program."""
+    row = DRIVER_ROW
+
     @classmethod
     def add_subplot(cls, fig):
         cls.axis = fig.add_subplot(PLOT_ROWS, PLOT_COLS, 6, label="driver", xlim=(0, NUM_TIMESTEPS), ylim=(-0.5, 5))
@@ -144,5 +228,5 @@ class Dqdv(Metric):
 
     @classmethod
     def set_data(cls, xy):
-        cls.line.set_offsets(np.array(list(zip(xy[0], xy[1]))))  # change dots
+        cls.line.set_offsets(np.column_stack(xy))  # change dots
         return cls.line
@@ -7,7 +7,8 @@ from matplotlib.animation import FuncAnimation
 import config
 from battery import Battery
 from tester_program import TesterProgram
-from metric import Metrics, Charge, SOC, Current, Driver, Potential  # , Dqdv
+from metric import Metrics, MetricStore, Charge, SOC, Current, Driver, Potential  # , Dqdv
+from metric import METRIC_ROWS, SOC_ROW, INFLUX_ROW, DRIVER_ROW, POTENTIAL_ROW
 
 plt.style.use('seaborn-pastel')
 
@@ -39,9 +40,12 @@ class Tester:
         """
         self.battery = battery
         self.program = program
+        self.history = MetricStore(num_rows=len(METRIC_ROWS))
+        self._column = np.zeros(len(METRIC_ROWS), dtype=config.DTYPE)  # Reused for each append
+        self.history.append(0, self._column)
         self.metrics = Metrics(
-            Charge(Charge.get_init_vals()[0], battery.charge_curve), SOC(0, 0), Current(0, 0),
-            Driver(0, 0), Potential(0, 0)  # , Dqdv(0, 0)
+            Charge(Charge.get_init_vals()[0], battery.charge_curve), SOC(self.history),
+            Current(self.history), Driver(self.history), Potential(self.history)  # , Dqdv
         )
 
     def setup_figure(self):
@@ -90,21 +94,22 @@ class Tester:
         frame
         """
         battery, program, metrics = (self.battery, self.program, self.metrics)
-        print("calc frame %s - %s" % (program.timestep, program.step))
-
-        # Record the driver.
-        metrics.driver.update(program.timestep, program.driver)
+        print("calc frame %s - %s" % (program.timestep, program.step.name))
 
         # Apply potential to the battery for one timestep.
-        battery.apply_potential(program.driver)
+        _, timestep_current = battery.apply_potential(program.driver)
 
         # Get the new charge curve.
         metrics.charge.update(metrics.charge.x, battery.charge_curve)
 
-        # Update metrics
-        metrics.soc.update(program.timestep, np.sum(metrics.charge.y))
-        metrics.influx.update(program.timestep, metrics.soc.delta())
-        metrics.potential.update(program.timestep, metrics.charge.y[0])
+        # Update metrics in one column.  The battery already summed its charge, so reuse its soc
+        # and current.
+        column = self._column
+        column[SOC_ROW] = battery.soc
+        column[INFLUX_ROW] = timestep_current
+        column[DRIVER_ROW] = program.driver
+        column[POTENTIAL_ROW] = battery.charge_curve[0]
+        self.history.append(program.timestep, column)
         # metrics.dqdv.update(
         #     potential.val,
         #     metrics.soc.delta() / metrics.potential.delta() if phase == "CHARGE_CC" else 0
@@ -114,7 +119,7 @@ class Tester:
         program.advance(battery, metrics.influx.get_val())
 
         # Append curves to frame list for plot animation.
-        frame = [metric.get_xy_copy() for metric in metrics]  # can't be a generator for anim.
+        frame = [metric.get_xy() for metric in metrics]  # can't be a generator for anim.
         return frame
 
     def generate_frames(self, num_timesteps):
@@ -151,30 +156,30 @@ class Tester:
         fig = self.setup_figure()
         plot_init = self.get_init()
 
+        # Run the whole program before rendering, so drawing a frame does no simulation work.
+        # Frames hold views of the metric histories, which later timesteps never modify.
+        frames = list(self.generate_frames(num_timesteps))
+
         # Render plots.
         if do_animate:
             # Animate plots.
             animate = self.get_animate()
-            frames = self.generate_frames(num_timesteps)
             # noinspection PyTypeChecker
             anim = FuncAnimation(
                 fig, animate, init_func=plot_init, frames=frames, interval=config.ANIM_INTERVAL,
-                repeat=True, repeat_delay=1000, blit=True, save_count=num_timesteps
+                repeat=True, repeat_delay=1000, blit=True
             )
 
             # Save animation or show snapshot.
             if save:
                 print("Saving animation...")
-                anim.save(config.ANIM_SAVE_FILE, writer='imagemagick', dpi=config.ANIM_DPI)
+                anim.save(config.ANIM_SAVE_FILE, writer='pillow', dpi=config.ANIM_DPI)
                 print("Done.")
             else:
                 plt.show()
         else:
             # Plot without animation.
-            frame = None
-            for i in range(num_timesteps):
-                frame = self.advance_timestep()
-            self.get_animate()(frame)
+            self.get_animate()(frames[-1])
             plt.show()
 
     def run_one_timestep(self, program, battery, driver, t, phase, soc_y, influx_y, ):
@@ -1,8 +1,19 @@
 """Defines a test program (aka procedure, protocol)."""
 
+from enum import IntEnum
+
 from config import *
 
 
+class Step(IntEnum):
+    """Steps of the program.  The values index TesterProgram's table of step handlers."""
+    CHARGE_CC = 0
+    CHARGE_CV = 1
+    REST = 2
+    DISCHARGE_CC = 3
+    DISCHARGE_CV = 4
+
+
 class TesterProgram:
     """Program."""
 
@@ -14,8 +25,20 @@ class TesterProgram:
     """Current timestep of the entire program."""
     timesteps_in_step = 1
     """Number of timesteps taken in this program step so far."""
-    step = "CHARGE_CC"
-    """Step of the program."""
+    _step = Step.CHARGE_CC
+
+    @property
+    def step(self):
+        """Step of the program."""
+        return self._step
+
+    @step.setter
+    def step(self, step):
+        # Validate once here, so dispatch can index the handler table directly.
+        try:
+            self._step = Step(step)
+        except ValueError:
+            raise Exception("Unrecognized Test Step '%s'" % step)
 
     def advance(self, battery, current, increment_timesteps=True):
         """Advance the test program one timestep.
@@ -35,7 +58,6 @@ class TesterProgram:
         -------
         target_current
         """
-        step = self.step
         timesteps_in_step = self.timesteps_in_step
         # Increment timesteps
         if increment_timesteps:
@@ -44,47 +66,50 @@ class TesterProgram:
 
         pot = battery.ocp  # potential 1 tick in, not drive potential
         # pot = charge_y[0]  # drive potential
-        if step == "CHARGE_CC":
-            if pot >= CHARGE_CV:
-                # Change phase.
-                self.step = "CHARGE_CV"
-                return self.advance(battery, current, increment_timesteps=False)
-            else:
-                target_current = CHARGE_CC
-                self.driver = battery.get_driver_for_target_current(target_current)
-        elif step == "CHARGE_CV":
-            # Check if current is close to 0.
-            if current < ZERO_CURRENT_THRESHOLD:
-                # Change step.
-                self.step = "REST"
-                return self.advance(battery, current, increment_timesteps=False)
-            else:
-                target_pot = CHARGE_CV
-                self.driver = battery.get_driver_for_target_ocp(target_pot)
-        elif step == "REST":
-            if timesteps_in_step > REST_TIMESTEPS:
-                # Change step.
-                self.step = "DISCHARGE_CC"
-                return self.advance(battery, current, increment_timesteps=False)
-            else:
-                target_current = 0
-                self.driver = battery.get_driver_for_target_current(target_current)
-        elif step == "DISCHARGE_CC":
-            if pot <= DISCHARGE_CV:
-                # Change step.
-                self.step = "DISCHARGE_CV"
-                return self.advance(battery, current, increment_timesteps=False)
-            else:
-                target_current = -CHARGE_CC
-                self.driver = battery.get_driver_for_target_current(target_current)
-        elif step == "DISCHARGE_CV":
-            # Check if current is close to 0.
-            if current > -ZERO_CURRENT_THRESHOLD:
-                # Change step back to beginning of new cycle.
-                self.step ="CHARGE_CC"
-                return self.advance(battery, current, increment_timesteps=False)
-            else:
-                target_pot = DISCHARGE_CV
-                self.driver = battery.get_driver_for_target_ocp(target_pot)
-        else:
-            raise Exception("Unrecognized Test Step '%s'" % step)
\ No newline at end of file
+        # Run step handlers until one sets the driver rather than changing step.  Handlers only
+        # return valid steps, so they are stored without going through the step setter.
+        handlers = self._handlers
+        next_step = handlers[self._step](self, battery, pot, current, timesteps_in_step)
+        while next_step is not None:
+            self._step = next_step
+            next_step = handlers[next_step](self, battery, pot, current, self.timesteps_in_step)
+
+    def _charge_cc(self, battery, pot, current, timesteps_in_step):
+        if pot >= CHARGE_CV:
+            # Change phase.
+            return Step.CHARGE_CV
+        target_current = CHARGE_CC
+        self.driver = battery.get_driver_for_target_current(target_current)
+
+    def _charge_cv(self, battery, pot, current, timesteps_in_step):
+        # Check if current is close to 0.
+        if current < ZERO_CURRENT_THRESHOLD:
+            # Change step.
+            return Step.REST
+        target_pot = CHARGE_CV
+        self.driver = battery.get_driver_for_target_ocp(target_pot)
+
+    def _rest(self, battery, pot, current, timesteps_in_step):
+        if timesteps_in_step > REST_TIMESTEPS:
+            # Change step.
+            return Step.DISCHARGE_CC
+        target_current = 0
+        self.driver = battery.get_driver_for_target_current(target_current)
+
+    def _discharge_cc(self, battery, pot, current, timesteps_in_step):
+        if pot <= DISCHARGE_CV:
+            # Change step.
+            return Step.DISCHARGE_CV
+        target_current = -CHARGE_CC
+        self.driver = battery.get_driver_for_target_current(target_current)
+
+    def _discharge_cv(self, battery, pot, current, timesteps_in_step):
+        # Check if current is close to 0.
+        if current > -ZERO_CURRENT_THRESHOLD:
+            # Change step back to beginning of new cycle.
+            return Step.CHARGE_CC
+        target_pot = DISCHARGE_CV
+        self.driver = battery.get_driver_for_target_ocp(target_pot)
+
+    _handlers = (_charge_cc, _charge_cv, _rest, _discharge_cc, _discharge_cv)
+    """Step handlers, indexed by Step."""
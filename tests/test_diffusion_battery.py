@@ -25,3 +25,86 @@ def test_get_driver_for_target_current():
     # Make projection; this should be close to target_val
     projected_ocp = bat.get_calc_ocp(bat.charge_curve)(drive_pot)
     assert round(float(target_ocp), 8) == round(projected_ocp, 8)
+
+
+def test_compute_charge_curve_matches_direct_convolution():
+    """Test that the spectral convolution reproduces a direct convolution of the padded curve."""
+    bat = DiffusionBattery()
+    charge_curve = np.linspace(0, 4, bat.cathode_width)
+    drive_pot = 3.5
+
+    # Reference: pad with the drive potential, mirror the far wall, and convolve directly.
+    y = charge_curve.copy()
+    y[0] = drive_pot
+    sigma = bat.cathode_width / 10
+    gx = np.arange(-3 * sigma, 3 * sigma + 1, 1.0)
+    gaussian = np.exp(-(gx ** 2) / (2 * sigma ** 2))
+    gaussian = gaussian / np.sum(gaussian)
+    base = np.concatenate((np.zeros(len(gaussian)), np.full(len(gaussian), drive_pot), y, np.flip(y)))
+    expected = np.convolve(base, gaussian, mode="same")[2 * len(gaussian):-len(y)]
+
+    np.testing.assert_allclose(bat.compute_charge_curve(drive_pot, charge_curve), expected, atol=1e-5)
+
+
+def test_equilibrium_has_no_current():
+    """Test that a uniform charge held at the same drive potential does not diffuse.
+
+    This holds only if the drive potential wall on the left and the mirror wall on the right
+    are both in place.
+    """
+    bat = DiffusionBattery()
+    bat.charge_curve = np.full(bat.cathode_width, 3, dtype=np.float32)
+    bat.soc = bat.charge_curve.sum()
+    ocp, timestep_current = bat.apply_potential(3)
+
+    np.testing.assert_allclose(bat.charge_curve, 3, rtol=1e-5)
+    assert abs(timestep_current) < 1e-2
+
+
+def test_compute_charge_curve_sees_in_place_edits():
+    """Test that editing a charge curve in place is not hidden by cached results."""
+    bat = DiffusionBattery()
+    charge_curve = np.linspace(0, 4, bat.cathode_width, dtype=np.float32)
+    bat.compute_charge_curve(2.0, charge_curve)
+    charge_curve[10:500] += 1
+
+    expected = DiffusionBattery().compute_charge_curve(2.0, charge_curve)
+    np.testing.assert_allclose(bat.compute_charge_curve(2.0, charge_curve), expected, atol=1e-5)
+
+    # A cached curve that is made writeable again and edited.
+    bat.apply_potential(2.0)
+    charge_curve = bat.charge_curve
+    bat.compute_charge_curve(2.0, charge_curve)
+    charge_curve.flags.writeable = True
+    charge_curve[10:500] += 1
+
+    expected = DiffusionBattery().compute_charge_curve(2.0, charge_curve)
+    np.testing.assert_allclose(bat.compute_charge_curve(2.0, charge_curve), expected, atol=1e-5)
+
+
+def test_apply_potential_leaves_charge_curve_read_only():
+    """Test that the battery's own charge curve, whose diffusion is cached, can't be edited."""
+    bat = DiffusionBattery()
+    bat.apply_potential(2.0)
+
+    with pytest.raises(ValueError):
+        bat.charge_curve[0] = 1
+
+
+def test_empty_charge_curve():
+    """Test that a battery can be constructed with an empty charge curve."""
+    bat = DiffusionBattery(charge_curve=np.array([]))
+    assert len(bat.charge_curve) == 0
+
+
+@pytest.mark.parametrize("cathode_width", [15, 1000])
+def test_driver_for_target_current_hits_target(cathode_width):
+    """Test that the drive potential solved for a target current produces that current."""
+    bat = DiffusionBattery(cathode_width=cathode_width)
+    x = np.arange(cathode_width)
+    bat.charge_curve = (2 + np.sin(x / 7) + x / cathode_width).astype(np.float32)
+    target_current = 5
+
+    drive_pot = bat.get_driver_for_target_current(target_current)
+
+    assert bat.compute_current(drive_pot, bat.charge_curve) == pytest.approx(target_current, abs=1e-3)
@@ -0,0 +1,45 @@
+"""Tests of the metric histories."""
+
+import numpy as np
+
+from .context import battery
+from battery.metric import MetricStore, SOC, Driver
+from battery.metric import METRIC_ROWS, SOC_ROW, INFLUX_ROW, DRIVER_ROW, POTENTIAL_ROW
+
+
+def append_timestep(store, t):
+    """Append a timestep whose value in each row is recognizable from the row and t."""
+    store.append(t, 10 * np.array(METRIC_ROWS) + t)
+
+
+def test_views_survive_growth():
+    """Test that views handed out before the store grows keep their values."""
+    store = MetricStore(capacity=4)
+    soc, driver = SOC(store), Driver(store)
+    for t in range(3):
+        append_timestep(store, t)
+    early = [(metric.x, metric.y) for metric in (soc, driver)]
+    early_copies = [(x.copy(), y.copy()) for x, y in early]
+
+    # Append well past the capacity, forcing the buffers to double more than once.
+    for t in range(3, 20):
+        append_timestep(store, t)
+
+    assert len(store.x) > 4
+    for (x, y), (x_copy, y_copy) in zip(early, early_copies):
+        np.testing.assert_array_equal(x, x_copy)
+        np.testing.assert_array_equal(y, y_copy)
+
+
+def test_rows_hold_appended_values():
+    """Test that each row holds the values appended for it, across growth."""
+    store = MetricStore(capacity=4)
+    for t in range(20):
+        append_timestep(store, t)
+
+    t = np.arange(20)
+    np.testing.assert_array_equal(store.x[:store.n], t)
+    for row in (SOC_ROW, INFLUX_ROW, DRIVER_ROW, POTENTIAL_ROW):
+        np.testing.assert_array_equal(store.data[row, :store.n], 10 * row + t)
+    np.testing.assert_array_equal(SOC(store).y, 10 * SOC_ROW + t)
+    assert Driver(store).get_val() == 10 * DRIVER_ROW + 19